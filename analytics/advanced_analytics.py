@@ -5,8 +5,9 @@ Includes Monte Carlo FX simulation and composite risk scoring
 
 import pandas as pd
 import numpy as np
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, text
 from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
 
 # =========================
 # 1. DATABASE CONNECTION
@@ -80,6 +81,20 @@ def detect_volatility_regimes(log_returns: pd.Series, window: int = 20) -> dict:
     }
 
 
+def _antithetic_draws(rng, simulations: int, p_high: float, days: int | None = None):
+    """
+    Regime flags and standard-normal shocks drawn as antithetic pairs: the
+    second half of the simulations reuses the first half's regimes with
+    negated shocks, which lowers the variance of the percentile estimates
+    for the same simulation count while halving the random draws.
+    """
+    half = (simulations + 1) // 2
+    shape = (half,) if days is None else (half, days)
+    high = rng.random(shape, dtype=np.float32) < p_high
+    z = rng.standard_normal(shape, dtype=np.float32)
+    return np.concatenate([high, high])[:simulations], np.concatenate([z, -z])[:simulations]
+
+
 def simulate_regime_weighted_paths(
     current_rate: float,
     days: int,
@@ -97,19 +112,57 @@ def simulate_regime_weighted_paths(
     mu_high = regime_stats["mu_high"]
     sigma_high = regime_stats["sigma_high"]
 
-    paths = np.zeros((simulations, days), dtype=float)
+    # Draw every regime choice and shock at once, then compound along each path.
+    # float32 is ample for FX rates and halves the memory traffic of the buffer.
+    high, shocks = _antithetic_draws(rng, simulations, p_high, days)
+    shocks *= np.where(high, np.float32(sigma_high * np.sqrt(dt)), np.float32(sigma_low * np.sqrt(dt)))
+    shocks += np.where(high, np.float32(mu_high * dt), np.float32(mu_low * dt))
+
+    np.cumsum(shocks, axis=1, out=shocks)
+    np.exp(shocks, out=shocks)
+    shocks *= np.float32(current_rate)
+
+    return shocks
+
+
+def simulate_terminal_rates(
+    current_rate: float,
+    days: int,
+    simulations: int,
+    regime_stats: dict,
+    seed: int = 42,
+):
+    """
+    Terminal rates of regime-weighted paths without materialising the paths.
+    Steps every simulation forward one day at a time, so memory is
+    O(simulations) instead of O(simulations x days).
+    """
+    dt = 1 / 252
+    rng = np.random.default_rng(seed)
+
+    p_high = regime_stats["p_high"]
+    mu_low, mu_high = np.float32(regime_stats["mu_low"] * dt), np.float32(regime_stats["mu_high"] * dt)
+    sigma_low = np.float32(regime_stats["sigma_low"] * np.sqrt(dt))
+    sigma_high = np.float32(regime_stats["sigma_high"] * np.sqrt(dt))
+
+    log_rate = np.zeros(simulations, dtype=np.float32)
+    for _ in range(days):
+        high, z = _antithetic_draws(rng, simulations, p_high)
+        log_rate += np.where(high, mu_high + sigma_high * z, mu_low + sigma_low * z)
+
+    return np.float32(current_rate) * np.exp(log_rate)
+
+
+# Above this many simulations only terminal rates are simulated (see above)
+LARGE_SIMULATION_THRESHOLD = 20_000
 
-    for i in range(simulations):
-        rate = float(current_rate)
-        for d in range(days):
-            if rng.random() < p_high:
-                shock = rng.normal(mu_high * dt, sigma_high * np.sqrt(dt))
-            else:
-                shock = rng.normal(mu_low * dt, sigma_low * np.sqrt(dt))
-            rate *= np.exp(shock)
-            paths[i, d] = rate
+FX_HISTORY_SQL = text("""
+    SELECT rate_date, rate_to_usd
+    FROM fx_rates
+    WHERE currency_id = :currency_id
+    ORDER BY rate_date
+""")
 
-    return paths
 
 def run_fx_simulation(currency_id=3, days=90, simulations=10000):
     """
@@ -125,14 +178,7 @@ def run_fx_simulation(currency_id=3, days=90, simulations=10000):
         Number of Monte Carlo paths
     """
     
-    fx_query = f"""
-    SELECT rate_date, rate_to_usd
-    FROM fx_rates
-    WHERE currency_id = {currency_id}
-    ORDER BY rate_date
-    """
-
-    fx_df = pd.read_sql(fx_query, engine)
+    fx_df = pd.read_sql(FX_HISTORY_SQL, engine, params={"currency_id": currency_id})
 
     if fx_df.empty:
         raise ValueError(f"No FX data available for currency_id={currency_id}")
@@ -154,18 +200,22 @@ def run_fx_simulation(currency_id=3, days=90, simulations=10000):
     print(f"  Low-Vol Regime:  μ={regime_stats['mu_low']:.6f}, σ={regime_stats['sigma_low']:.6f}, p={regime_stats['p_low']:.2%}")
     print(f"  High-Vol Regime: μ={regime_stats['mu_high']:.6f}, σ={regime_stats['sigma_high']:.6f}, p={regime_stats['p_high']:.2%}")
 
-    # Regime-weighted Monte Carlo simulation
-    paths = simulate_regime_weighted_paths(
+    # Regime-weighted Monte Carlo simulation (only the terminal day is used)
+    simulate = (
+        simulate_terminal_rates if simulations >= LARGE_SIMULATION_THRESHOLD
+        else simulate_regime_weighted_paths
+    )
+    rates = simulate(
         current_rate=current_rate,
         days=days,
         simulations=simulations,
         regime_stats=regime_stats,
         seed=42,
     )
-    final_rates = paths[:, -1]
+    final_rates = rates if rates.ndim == 1 else rates[:, -1]
 
     # Calculate percentiles
-    p5, p50, p95 = np.percentile(final_rates, [5, 50, 95])
+    p5, p50, p95 = np.percentile(final_rates, [5, 50, 95]).astype(float)
 
     print(f"\nForecast ({days} days ahead):")
     print(f"  5th Percentile (worst case): {p5:.6f}")
@@ -202,16 +252,8 @@ def run_fx_simulation(currency_id=3, days=90, simulations=10000):
 # 3. COMPOSITE RISK SCORE
 # =========================
 
-def run_supplier_risk():
-    """
-    Calculate comprehensive supplier risk metrics.
-    Writes all required columns to supplier_performance_metrics table.
-    """
-    
-    print("\nCalculating Supplier Risk Metrics...")
-
-    # Lead time metrics
-    lead_query = """
+# Lead time metrics
+LEAD_TIME_SQL = text("""
     SELECT 
         supplier_id,
         AVG(DATEDIFF(delivery_date, order_date)) AS avg_lead_time,
@@ -219,27 +261,19 @@ def run_supplier_risk():
     FROM purchase_orders
     WHERE delivery_date IS NOT NULL
     GROUP BY supplier_id
-    """
-
-    lead_df = pd.read_sql(lead_query, engine)
+""")
 
-    if lead_df.empty:
-        print("⚠ No lead time data available")
-        return
-
-    # Quality metrics (defect rates)
-    quality_query = """
+# Quality metrics (defect rates)
+QUALITY_SQL = text("""
     SELECT 
         supplier_id,
         AVG(defect_rate) * 100 AS avg_defect_rate
     FROM quality_incidents
     GROUP BY supplier_id
-    """
-
-    quality_df = pd.read_sql(quality_query, engine)
+""")
 
-    # On-time delivery (actual lead time vs supplier's published lead time)
-    otd_query = """
+# On-time delivery (actual lead time vs supplier's published lead time)
+ON_TIME_DELIVERY_SQL = text("""
     SELECT 
         po.supplier_id,
         (SUM(CASE WHEN DATEDIFF(po.delivery_date, po.order_date) <= s.lead_time_days THEN 1 ELSE 0 END) * 100.0 / COUNT(*)) as on_time_delivery_pct
@@ -247,24 +281,20 @@ def run_supplier_risk():
     JOIN suppliers s ON po.supplier_id = s.supplier_id
     WHERE po.delivery_date IS NOT NULL AND po.order_date IS NOT NULL
     GROUP BY po.supplier_id
-    """
-
-    otd_df = pd.read_sql(otd_query, engine)
+""")
 
-    # Cost variance
-    cost_query = """
+# Cost variance
+COST_VARIANCE_SQL = text("""
     SELECT 
         po.supplier_id,
         (STDDEV(poi.unit_price) / AVG(poi.unit_price) * 100) as cost_variance_pct
     FROM purchase_orders po
     JOIN purchase_order_items poi ON po.po_id = poi.po_id
     GROUP BY po.supplier_id
-    """
-
-    cost_df = pd.read_sql(cost_query, engine)
+""")
 
-    # FX exposure
-    fx_query = """
+# FX exposure
+FX_EXPOSURE_SQL = text("""
     SELECT 
         po.supplier_id,
         (SUM(CASE WHEN cur.currency_code != 'USD' THEN poi.quantity * poi.unit_price ELSE 0 END) * 100.0 / 
@@ -273,15 +303,76 @@ def run_supplier_risk():
     JOIN purchase_order_items poi ON po.po_id = poi.po_id
     JOIN currencies cur ON po.currency_id = cur.currency_id
     GROUP BY po.supplier_id
-    """
+""")
 
-    fx_df = pd.read_sql(fx_query, engine)
-
-    geo_query = """
+# Geographic risk
+GEO_RISK_SQL = text("""
     SELECT supplier_id, COALESCE(risk_index, 0) AS geographic_risk_index
     FROM suppliers
+""")
+
+# Denormalised copy of supplier_performance_metrics + supplier names, indexed
+# on the risk score, so dashboard reads are an index scan instead of a join
+SUPPLIER_RISK_SUMMARY_DDL = text("""
+    CREATE TABLE IF NOT EXISTS supplier_risk_summary (
+        supplier_id INT PRIMARY KEY,
+        supplier_name VARCHAR(255),
+        avg_lead_time DOUBLE,
+        lead_time_stddev DOUBLE,
+        avg_defect_rate DOUBLE,
+        cost_variance_pct DOUBLE,
+        on_time_delivery_pct DOUBLE,
+        fx_exposure_pct DOUBLE,
+        composite_risk_score DOUBLE,
+        last_updated DATETIME,
+        INDEX idx_risk (composite_risk_score DESC)
+    )
+""")
+
+SUPPLIER_RISK_SUMMARY_REFRESH_SQL = text("""
+    INSERT INTO supplier_risk_summary
+    SELECT s.supplier_id, s.supplier_name,
+           spm.avg_lead_time, spm.lead_time_stddev,
+           spm.avg_defect_rate, spm.cost_variance_pct,
+           spm.on_time_delivery_pct, spm.fx_exposure_pct,
+           spm.composite_risk_score, spm.last_updated
+    FROM supplier_performance_metrics spm
+    JOIN suppliers s ON spm.supplier_id = s.supplier_id
+""")
+
+
+def refresh_supplier_risk_summary():
+    """
+    Rebuild supplier_risk_summary from supplier_performance_metrics.
+    DELETE + INSERT run in one transaction so readers never see it empty.
     """
-    geo_df = pd.read_sql(geo_query, engine)
+    with engine.begin() as conn:
+        conn.execute(SUPPLIER_RISK_SUMMARY_DDL)
+        conn.execute(text("DELETE FROM supplier_risk_summary"))
+        conn.execute(SUPPLIER_RISK_SUMMARY_REFRESH_SQL)
+
+
+def run_supplier_risk():
+    """
+    Calculate comprehensive supplier risk metrics.
+    Writes all required columns to supplier_performance_metrics table.
+    """
+    
+    print("\nCalculating Supplier Risk Metrics...")
+
+    # All metric reads share one pooled connection
+    with engine.connect() as conn:
+        lead_df = pd.read_sql(LEAD_TIME_SQL, conn)
+
+        if lead_df.empty:
+            print("⚠ No lead time data available")
+            return
+
+        quality_df = pd.read_sql(QUALITY_SQL, conn)
+        otd_df = pd.read_sql(ON_TIME_DELIVERY_SQL, conn)
+        cost_df = pd.read_sql(COST_VARIANCE_SQL, conn)
+        fx_df = pd.read_sql(FX_EXPOSURE_SQL, conn)
+        geo_df = pd.read_sql(GEO_RISK_SQL, conn)
 
     # Merge all metrics
     df = lead_df.merge(quality_df, on='supplier_id', how='left')
@@ -343,6 +434,7 @@ def run_supplier_risk():
         if_exists="replace",
         index=False
     )
+    refresh_supplier_risk_summary()
 
     print(f"✓ Updated {len(final_df)} supplier risk profiles")
     print(f"\nRisk Score Summary:")
@@ -353,17 +445,32 @@ def run_supplier_risk():
 # MAIN PIPELINE
 # =========================
 
+def run_analytics_pipeline(currency_id=3, days=90, simulations=10000):
+    """
+    Run the FX simulation and supplier risk scoring concurrently.
+
+    The two stages read the warehouse independently and write disjoint
+    tables (fx_simulation_results, supplier_performance_metrics and
+    supplier_risk_summary), so the
+    database round trips of one overlap the NumPy work of the other.
+    Returns (fx_result, None) — run_supplier_risk returns nothing.
+    """
+    with ThreadPoolExecutor(max_workers=2) as pool:
+        fx_future = pool.submit(
+            run_fx_simulation, currency_id=currency_id, days=days, simulations=simulations
+        )
+        risk_future = pool.submit(run_supplier_risk)
+        return fx_future.result(), risk_future.result()
+
+
 if __name__ == "__main__":
     print("="*60)
     print("Advanced Analytics: FX Simulation & Supplier Risk")
     print("="*60)
     
     try:
-        # Run FX Monte Carlo simulation (NGN = currency_id 3)
-        run_fx_simulation(currency_id=3, days=90, simulations=10000)
-        
-        # Calculate supplier risk metrics
-        run_supplier_risk()
+        # FX Monte Carlo (NGN = currency_id 3) and supplier risk, in parallel
+        run_analytics_pipeline(currency_id=3, days=90, simulations=10000)
         
         print("\n" + "="*60)
         print("✓ Analytics pipeline completed successfully!")
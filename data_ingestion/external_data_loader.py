@@ -94,7 +94,10 @@ class DataValidator:
         except Exception as e:
             self.errors.append(f"Failed to read {file_type}: {e}")
             return False
-        
+        return self.validate_dataframe(df, file_type)
+    
+    def validate_dataframe(self, df, file_type):
+        """Validate an already-parsed DataFrame against schema."""
         spec = SCHEMA.get(file_type)
         if not spec:
             self.errors.append(f"Unknown file type: {file_type}")
@@ -181,35 +184,62 @@ class DataValidator:
 class ExternalDataLoader:
     """Load and import external company data into PVIS."""
     
-    def __init__(self, input_dir):
-        self.input_dir = Path(input_dir)
+    required_files = ["suppliers", "materials", "purchase_orders", "purchase_order_items"]
+    
+    def __init__(self, input_dir=None):
+        self.input_dir = Path(input_dir) if input_dir is not None else None
         self.validator = DataValidator()
         self.data = {}
     
     def load_all_files(self):
         """Load and validate all input CSV files."""
-        required_files = ["suppliers", "materials", "purchase_orders", "purchase_order_items"]
-        
         print(f"Loading external data from: {self.input_dir}")
         print()
         
-        for file_type in required_files:
+        for file_type in self.required_files:
             file_path = self.input_dir / f"{file_type}.csv"
             
             if not file_path.exists():
                 print(f"⚠ Missing: {file_type}.csv")
                 continue
             
-            print(f"Validating {file_type}.csv...", end=" ")
-            if self.validator.validate_file(str(file_path), file_type):
-                print("✓")
-                self.data[file_type] = pd.read_csv(file_path)
-            else:
-                print("✗")
-                for err in self.validator.errors:
-                    print(f"  Error: {err}")
-                self.validator.errors.clear()
+            try:
+                df = pd.read_csv(file_path)
+            except Exception as e:
+                print(f"✗ Failed to read {file_type}.csv: {e}")
+                continue
+            self._accept(file_type, df)
         
+        return self._finish_loading()
+    
+    def load_dataframes(self, dfs):
+        """Validate pre-parsed DataFrames keyed by file type; same result as load_all_files."""
+        print("Loading external data from uploaded DataFrames")
+        print()
+        
+        for file_type in self.required_files:
+            if file_type not in dfs:
+                print(f"⚠ Missing: {file_type}")
+                continue
+            # Import steps add columns in place; keep the caller's frame untouched
+            self._accept(file_type, dfs[file_type].copy())
+        
+        return self._finish_loading()
+    
+    def _accept(self, file_type, df):
+        """Validate one parsed file and keep it if it passes."""
+        print(f"Validating {file_type}.csv...", end=" ")
+        if self.validator.validate_dataframe(df, file_type):
+            print("✓")
+            self.data[file_type] = df
+        else:
+            print("✗")
+            for err in self.validator.errors:
+                print(f"  Error: {err}")
+            self.validator.errors.clear()
+    
+    def _finish_loading(self):
+        """Report accumulated warnings; True when every required file loaded."""
         if self.validator.warnings:
             print()
             print("Warnings:")
@@ -217,7 +247,7 @@ class ExternalDataLoader:
                 print(f"  ⚠ {warn}")
             self.validator.warnings.clear()
         
-        return len(self.data) == 4
+        return len(self.data) == len(self.required_files)
     
     def import_data(self):
         """Import validated data into database."""
@@ -262,7 +292,7 @@ class ExternalDataLoader:
             "purchase_order_items", "purchase_orders",
             "quality_incidents", "inventory_snapshots",
             "payables_summary", "receivables_summary",
-            "supplier_performance_metrics",
+            "supplier_performance_metrics", "supplier_risk_summary",
             "dim_supplier", "dim_material"
         ]
         with engine.connect() as conn:
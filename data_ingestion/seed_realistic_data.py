@@ -18,7 +18,7 @@ Then: python data_ingestion/populate_warehouse.py
 import pandas as pd
 import numpy as np
 from datetime import datetime, timedelta, date
-from sqlalchemy import create_engine, text
+from sqlalchemy import create_engine, text, table, column, insert
 import random, math, sys, os
 
 # ── Reproducibility ──────────────────────────────────────────────────────────
@@ -38,8 +38,15 @@ START = date(2023, 1, 1)
 END   = date(2025, 12, 31)
 
 
-def _safe_replace(df: pd.DataFrame, table: str):
-    """to_sql with if_exists='replace' but disable FK checks first."""
+def _safe_replace(df: pd.DataFrame, table: str, conn=None):
+    """to_sql with if_exists='replace' but disable FK checks first.
+
+    When an open connection is passed it is reused for the write and the
+    caller owns FK checks (main() disables them once for the whole seed).
+    """
+    if conn is not None:
+        df.to_sql(table, conn, if_exists="replace", index=False)
+        return
     with engine.connect() as conn:
         conn.execute(text("SET FOREIGN_KEY_CHECKS = 0"))
         conn.commit()
@@ -152,7 +159,7 @@ def _build_materials():
 #  FX RATE GENERATION (GBM with regime shifts)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def _generate_fx_rates():
+def _generate_fx_rates(conn=None):
     """
     Daily rates for NGN, EUR, GBP, CNY (all expressed as units per 1 USD).
     NGN undergoes two step-devaluations; EUR/GBP/CNY follow mean-reverting GBM.
@@ -195,20 +202,15 @@ def _generate_fx_rates():
     # CNY per USD (~7.0–7.35)
     cny = gbm_series(6.95, 0.0001, 0.003, n, mean_revert=0.02, target=7.15)
 
-    rows = []
-    fxid = 1
-    for i, d in enumerate(dates):
-        for cid, rate in [(3, ngn[i]), (2, eur[i]), (4, gbp[i]), (5, cny[i])]:
-            rows.append({
-                "fx_id":       fxid,
-                "currency_id": cid,
-                "rate_date":   d.date(),
-                "rate_to_usd": round(rate, 6),
-            })
-            fxid += 1
-
-    df = pd.DataFrame(rows)
-    _safe_replace(df, "fx_rates")
+    # One row per (day, currency), currencies interleaved day by day
+    currency_ids = [3, 2, 4, 5]
+    df = pd.DataFrame({
+        "fx_id":       np.arange(1, n * len(currency_ids) + 1),
+        "currency_id": np.tile(currency_ids, n),
+        "rate_date":   np.repeat(dates.date, len(currency_ids)),
+        "rate_to_usd": np.column_stack([ngn, eur, gbp, cny]).ravel().round(6),
+    })
+    _safe_replace(df, "fx_rates", conn)
     print(f"    ✓ {len(df):,} FX rate rows  ({len(dates)} days × 4 currencies)")
     return df
 
@@ -217,7 +219,7 @@ def _generate_fx_rates():
 #  PURCHASE ORDERS  (~800 POs)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def _generate_purchase_orders(materials):
+def _generate_purchase_orders(materials, conn=None):
     """
     ~800 POs spread across 36 months and 8 suppliers.
     Each PO gets 1-4 line items from realistic material pools.
@@ -229,8 +231,6 @@ def _generate_purchase_orders(materials):
     per_month = max(1, target_total // len(months))  # ~22 per month
 
     po_rows, item_rows = [], []
-    po_id = 1
-    item_id = 1
 
     # Pre-assign material pools per supplier (each supplier focuses on 2-3 categories)
     cat_names = list(MATERIAL_CATEGORIES.keys())
@@ -270,7 +270,6 @@ def _generate_purchase_orders(materials):
             status = "Completed" if r < 0.80 else ("In Progress" if r < 0.92 else "Cancelled")
 
             po_rows.append({
-                "po_id":           po_id,
                 "supplier_id":     sid,
                 "order_date":      order_date,
                 "delivery_date":   delivery_date if status != "Cancelled" else None,
@@ -289,21 +288,19 @@ def _generate_purchase_orders(materials):
                 # Unit price fluctuates ±25 % around standard cost
                 unit_price = round(std_cost * random.uniform(0.75, 1.25), 4)
                 item_rows.append({
-                    "po_item_id":  item_id,
-                    "po_id":       po_id,
+                    "po_id":       len(po_rows),  # 1-based id of the PO just added
                     "material_id": mat[0],
                     "quantity":    qty,
                     "unit_price":  unit_price,
                 })
-                item_id += 1
-
-            po_id += 1
 
     po_df = pd.DataFrame(po_rows)
+    po_df.insert(0, "po_id", np.arange(1, len(po_df) + 1))
     items_df = pd.DataFrame(item_rows)
+    items_df.insert(0, "po_item_id", np.arange(1, len(items_df) + 1))
 
-    _safe_replace(items_df, "purchase_order_items")
-    _safe_replace(po_df, "purchase_orders")
+    _safe_replace(items_df, "purchase_order_items", conn)
+    _safe_replace(po_df, "purchase_orders", conn)
 
     print(f"    ✓ {len(po_df):,} purchase orders")
     print(f"    ✓ {len(items_df):,} line items")
@@ -314,12 +311,13 @@ def _generate_purchase_orders(materials):
 #  QUALITY INCIDENTS  (~7 % of completed deliveries)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def _generate_quality_incidents(po_df, items_df):
+def _generate_quality_incidents(po_df, items_df, conn=None):
     """~7% of completed PO-items produce a quality incident."""
     print("  Generating quality incidents …")
-    completed = po_df[po_df["status"] == "Completed"]
-    completed_items = items_df[items_df["po_id"].isin(completed["po_id"])]
-    merged = completed_items.merge(completed[["po_id", "supplier_id", "delivery_date"]], on="po_id")
+    joined = items_df.join(
+        po_df.set_index("po_id")[["supplier_id", "delivery_date", "status"]], on="po_id"
+    )
+    merged = joined[joined["status"] == "Completed"]
 
     n_incidents = max(1, int(len(merged) * 0.07))
     sample = merged.sample(n=n_incidents)
@@ -327,20 +325,19 @@ def _generate_quality_incidents(po_df, items_df):
     # Riskier suppliers get higher defect rates
     risk_map = {s[0]: s[4] for s in SUPPLIERS}  # supplier_id -> risk_index
 
-    rows = []
-    for idx, (_, r) in enumerate(sample.iterrows(), start=1):
-        base = risk_map.get(r["supplier_id"], 0.5)
-        defect_rate = round(np.clip(np.random.beta(2, 20) + base * 0.02, 0.001, 0.15), 4)
-        rows.append({
-            "incident_id":  idx,
-            "supplier_id":  int(r["supplier_id"]),
-            "material_id":  int(r["material_id"]),
-            "defect_rate":  defect_rate,
-            "incident_date": r["delivery_date"],
-        })
-
-    df = pd.DataFrame(rows)
-    _safe_replace(df, "quality_incidents")
+    defect_rates = []
+    for (supplier_id,) in sample[["supplier_id"]].itertuples(index=False, name=None):
+        base = risk_map.get(supplier_id, 0.5)
+        defect_rates.append(round(np.clip(np.random.beta(2, 20) + base * 0.02, 0.001, 0.15), 4))
+
+    df = pd.DataFrame({
+        "incident_id":   np.arange(1, len(sample) + 1),
+        "supplier_id":   sample["supplier_id"].to_numpy(dtype=np.int64),
+        "material_id":   sample["material_id"].to_numpy(dtype=np.int64),
+        "defect_rate":   defect_rates,
+        "incident_date": sample["delivery_date"].to_numpy(),
+    })
+    _safe_replace(df, "quality_incidents", conn)
     print(f"    ✓ {len(df):,} quality incidents")
 
 
@@ -348,12 +345,11 @@ def _generate_quality_incidents(po_df, items_df):
 #  INVENTORY SNAPSHOTS  (monthly, per material)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def _generate_inventory_snapshots(materials):
+def _generate_inventory_snapshots(materials, conn=None):
     """Monthly inventory value snapshot for each of the 50 materials."""
     print("  Generating inventory snapshots …")
     months = pd.date_range(START, END, freq="MS")
-    rows = []
-    sid = 1
+    quantities, values = [], []
     for mat in materials:
         # Each material starts with a random stock level, then drifts
         qty = random.randint(5_000, 40_000)
@@ -361,18 +357,18 @@ def _generate_inventory_snapshots(materials):
             # Seasonal adjustment (Q4 stock-build)
             season = 1.15 if m.month in (10, 11, 12) else 1.0
             qty = max(1_000, int(qty * random.uniform(0.85, 1.15) * season))
-            val = round(qty * mat[3] * random.uniform(0.95, 1.05), 4)
-            rows.append({
-                "snapshot_id":       sid,
-                "material_id":       mat[0],
-                "snapshot_date":     m.date(),
-                "quantity_on_hand":  qty,
-                "inventory_value_usd": val,
-            })
-            sid += 1
-
-    df = pd.DataFrame(rows)
-    _safe_replace(df, "inventory_snapshots")
+            quantities.append(qty)
+            values.append(round(qty * mat[3] * random.uniform(0.95, 1.05), 4))
+
+    n_rows = len(materials) * len(months)
+    df = pd.DataFrame({
+        "snapshot_id":         np.arange(1, n_rows + 1),
+        "material_id":         np.repeat([mat[0] for mat in materials], len(months)),
+        "snapshot_date":       np.tile(months.date, len(materials)),
+        "quantity_on_hand":    quantities,
+        "inventory_value_usd": values,
+    })
+    _safe_replace(df, "inventory_snapshots", conn)
     print(f"    ✓ {len(df):,} inventory snapshots  ({len(materials)} materials × {len(months)} months)")
 
 
@@ -380,7 +376,7 @@ def _generate_inventory_snapshots(materials):
 #  PAYABLES & RECEIVABLES SUMMARIES  (monthly)
 # ═══════════════════════════════════════════════════════════════════════════════
 
-def _generate_financial_summaries():
+def _generate_financial_summaries(conn=None):
     """Monthly AP & AR with seasonal trends + growth."""
     print("  Generating payables / receivables …")
     months = pd.date_range(START, END, freq="MS")
@@ -392,13 +388,12 @@ def _generate_financial_summaries():
         # Slight uptrend + seasonal bump in Q4
         grow = 1 + i * 0.005
         season = 1.20 if m.month in (10, 11, 12) else (0.90 if m.month in (1, 2) else 1.0)
-        ap = round(ap_base * grow * season * random.uniform(0.90, 1.10), 4)
-        ar = round(ar_base * grow * season * random.uniform(0.85, 1.15), 4)
-        pay.append({"summary_date": m.date(), "accounts_payable_usd": ap})
-        rec.append({"summary_date": m.date(), "accounts_receivable_usd": ar})
+        pay.append(round(ap_base * grow * season * random.uniform(0.90, 1.10), 4))
+        rec.append(round(ar_base * grow * season * random.uniform(0.85, 1.15), 4))
 
-    _safe_replace(pd.DataFrame(pay), "payables_summary")
-    _safe_replace(pd.DataFrame(rec), "receivables_summary")
+    summary_dates = months.date
+    _safe_replace(pd.DataFrame({"summary_date": summary_dates, "accounts_payable_usd": pay}), "payables_summary", conn)
+    _safe_replace(pd.DataFrame({"summary_date": summary_dates, "accounts_receivable_usd": rec}), "receivables_summary", conn)
     print(f"    ✓ {len(pay)} payables + {len(rec)} receivables monthly records")
 
 
@@ -412,73 +407,64 @@ def main():
     print(banner)
     print("=" * 60)
 
-    # 1. Reference data ────────────────────────────────────────────────────────
-    print("\n[1/7] Seeding reference tables …")
+    # Steps 1-6 share one connection; FK checks are toggled once around them.
     with engine.connect() as conn:
         conn.execute(text("SET FOREIGN_KEY_CHECKS = 0"))
-
-        # Clear stale derivative / analytics tables from previous runs
-        for stale_tbl in [
-            "fx_exposure_mapping", "negotiation_insights",
-            "scenario_planning_output", "supplier_performance_metrics",
-            "financial_kpis",
-        ]:
-            try:
-                conn.execute(text(f"DELETE FROM {stale_tbl}"))
-            except Exception:
-                pass  # table may not exist yet
-
-        conn.execute(text("DELETE FROM countries"))
-        for cid, name in COUNTRIES:
-            conn.execute(text("INSERT INTO countries (country_id, country_name) VALUES (:i, :n)"), {"i": cid, "n": name})
-
-        conn.execute(text("DELETE FROM currencies"))
-        for cid, code, name in CURRENCIES:
-            conn.execute(text(
-                "INSERT INTO currencies (currency_id, currency_code, currency_name) VALUES (:i, :c, :n)"
-            ), {"i": cid, "c": code, "n": name})
-
-        conn.execute(text("DELETE FROM suppliers"))
-        for sid, name, ctry, cur, risk, lt in SUPPLIERS:
-            conn.execute(text(
-                "INSERT INTO suppliers (supplier_id, supplier_name, country_id, "
-                "default_currency_id, risk_index, lead_time_days) "
-                "VALUES (:sid,:name,:ctry,:cur,:risk,:lt)"
-            ), {"sid": sid, "name": name, "ctry": ctry, "cur": cur, "risk": risk, "lt": lt})
-
-        materials = _build_materials()
-        conn.execute(text("DELETE FROM materials"))
-        for mid, name, cat, cost in materials:
-            conn.execute(text(
-                "INSERT INTO materials (material_id, material_name, category, standard_cost) "
-                "VALUES (:mid,:name,:cat,:cost)"
-            ), {"mid": mid, "name": name, "cat": cat, "cost": cost})
-
-        conn.execute(text("SET FOREIGN_KEY_CHECKS = 1"))
-        conn.commit()
-
-    print(f"    ✓ {len(COUNTRIES)} countries, {len(CURRENCIES)} currencies, "
-          f"{len(SUPPLIERS)} suppliers, {len(materials)} materials")
-
-    # 2. FX rates ──────────────────────────────────────────────────────────────
-    print("\n[2/7] FX rates …")
-    _generate_fx_rates()
-
-    # 3. Purchase orders ───────────────────────────────────────────────────────
-    print("\n[3/7] Purchase orders …")
-    po_df, items_df = _generate_purchase_orders(materials)
-
-    # 4. Quality incidents ─────────────────────────────────────────────────────
-    print("\n[4/7] Quality incidents …")
-    _generate_quality_incidents(po_df, items_df)
-
-    # 5. Inventory snapshots ───────────────────────────────────────────────────
-    print("\n[5/7] Inventory snapshots …")
-    _generate_inventory_snapshots(materials)
-
-    # 6. Financial summaries ───────────────────────────────────────────────────
-    print("\n[6/7] Financial summaries …")
-    _generate_financial_summaries()
+        try:
+            # 1. Reference data ────────────────────────────────────────────────
+            print("\n[1/7] Seeding reference tables …")
+
+            # Clear stale derivative / analytics tables from previous runs
+            for stale_tbl in [
+                "fx_exposure_mapping", "negotiation_insights",
+                "scenario_planning_output", "supplier_performance_metrics",
+                "supplier_risk_summary", "financial_kpis",
+            ]:
+                try:
+                    conn.execute(text(f"DELETE FROM {stale_tbl}"))
+                except Exception:
+                    pass  # table may not exist yet
+
+            # One executemany per reference table (batched by insertmanyvalues)
+            materials = _build_materials()
+            for name, columns, rows in [
+                ("countries", ["country_id", "country_name"], COUNTRIES),
+                ("currencies", ["currency_id", "currency_code", "currency_name"], CURRENCIES),
+                ("suppliers", ["supplier_id", "supplier_name", "country_id",
+                               "default_currency_id", "risk_index", "lead_time_days"], SUPPLIERS),
+                ("materials", ["material_id", "material_name", "category", "standard_cost"], materials),
+            ]:
+                conn.execute(text(f"DELETE FROM {name}"))
+                tbl = table(name, *(column(c) for c in columns))
+                conn.execute(insert(tbl), [dict(zip(columns, r)) for r in rows])
+            conn.commit()
+
+            print(f"    ✓ {len(COUNTRIES)} countries, {len(CURRENCIES)} currencies, "
+                  f"{len(SUPPLIERS)} suppliers, {len(materials)} materials")
+
+            # 2. FX rates ──────────────────────────────────────────────────────
+            print("\n[2/7] FX rates …")
+            _generate_fx_rates(conn)
+
+            # 3. Purchase orders ───────────────────────────────────────────────
+            print("\n[3/7] Purchase orders …")
+            po_df, items_df = _generate_purchase_orders(materials, conn)
+
+            # 4. Quality incidents ─────────────────────────────────────────────
+            print("\n[4/7] Quality incidents …")
+            _generate_quality_incidents(po_df, items_df, conn)
+
+            # 5. Inventory snapshots ───────────────────────────────────────────
+            print("\n[5/7] Inventory snapshots …")
+            _generate_inventory_snapshots(materials, conn)
+
+            # 6. Financial summaries ───────────────────────────────────────────
+            print("\n[6/7] Financial summaries …")
+            _generate_financial_summaries(conn)
+            conn.commit()
+        finally:
+            conn.execute(text("SET FOREIGN_KEY_CHECKS = 1"))
+            conn.commit()
 
     # 7. Summary ───────────────────────────────────────────────────────────────
     print("\n[7/7] Verifying row counts …")
@@ -210,6 +210,37 @@ CREATE TABLE IF NOT EXISTS fx_simulation_results (
     INDEX idx_fx_sim_currency_date (currency_id, simulation_date)
 );
 
+-- ============================================================
+-- SECTION 5: CREATE SUPPLIER RISK SUMMARY TABLE
+-- Denormalised supplier_performance_metrics + supplier_name read by the
+-- dashboard; rebuilt by the ETL and run_supplier_risk()
+-- ============================================================
+
+CREATE TABLE IF NOT EXISTS supplier_risk_summary (
+    supplier_id INT PRIMARY KEY,
+    supplier_name VARCHAR(255),
+    avg_lead_time DOUBLE,
+    lead_time_stddev DOUBLE,
+    avg_defect_rate DOUBLE,
+    cost_variance_pct DOUBLE,
+    on_time_delivery_pct DOUBLE,
+    fx_exposure_pct DOUBLE,
+    composite_risk_score DOUBLE,
+    last_updated DATETIME,
+    INDEX idx_risk (composite_risk_score DESC)
+);
+
+-- Backfill from the current metrics so the dashboard has rows immediately
+DELETE FROM supplier_risk_summary;
+INSERT INTO supplier_risk_summary
+SELECT s.supplier_id, s.supplier_name,
+       spm.avg_lead_time, spm.lead_time_stddev,
+       spm.avg_defect_rate, spm.cost_variance_pct,
+       spm.on_time_delivery_pct, spm.fx_exposure_pct,
+       spm.composite_risk_score, spm.last_updated
+FROM supplier_performance_metrics spm
+JOIN suppliers s ON spm.supplier_id = s.supplier_id;
+
 -- ============================================================
 -- VERIFICATION QUERIES
 -- ============================================================
@@ -284,4 +315,7 @@ DROP INDEX idx_qi_material_date ON quality_incidents;
 DROP INDEX idx_inventory_material_date ON inventory_snapshots;
 DROP INDEX idx_fact_date_supplier ON fact_procurement;
 DROP INDEX idx_fact_date_material ON fact_procurement;
+
+-- Drop Supplier Risk Summary
+DROP TABLE IF EXISTS supplier_risk_summary;
 */
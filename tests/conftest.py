@@ -1,9 +1,48 @@
 """Shared pytest fixtures for procurement-intelligence-engine tests."""
 
 import sys
+from functools import lru_cache
 from pathlib import Path
 
+import pytest
+
 # Ensure project root is on sys.path
 project_root = Path(__file__).resolve().parent.parent
 if str(project_root) not in sys.path:
     sys.path.insert(0, str(project_root))
+
+
+# ── Database-backed tests ────────────────────────────────────────────────────
+
+@lru_cache(maxsize=1)
+def _mysql_available() -> bool:
+    """Return True only if MySQL is actually accepting connections (probed once per process)."""
+    try:
+        from sqlalchemy import create_engine, text
+        from config import DATABASE_URL
+        engine = create_engine(DATABASE_URL, connect_args={"connect_timeout": 3})
+        with engine.connect() as conn:
+            conn.execute(text("SELECT 1"))
+        return True
+    except Exception:
+        return False
+
+
+@pytest.fixture(scope="session")
+def mysql_available() -> bool:
+    """Whether MySQL is reachable, from the same cached probe the skip hook uses."""
+    return _mysql_available()
+
+
+def pytest_collection_modifyitems(config, items):
+    """Skip ``requires_db`` tests when MySQL is unreachable.
+
+    The connection probe runs once per session, and only if something
+    collected actually needs the database.
+    """
+    db_items = [item for item in items if item.get_closest_marker("requires_db")]
+    if not db_items or _mysql_available():
+        return
+    skip = pytest.mark.skip(reason="MySQL is not reachable (CI or no local server)")
+    for item in db_items:
+        item.add_marker(skip)
@@ -36,18 +36,56 @@ def test_fx_simulation_default_simulations():
 
 def test_gbm_math():
     """Verify Geometric Brownian Motion produces reasonable FX paths."""
-    # Simulate a simple GBM path manually
-    np.random.seed(42)
+    # Simulate a simple GBM path manually, all days in one draw
+    rng = np.random.default_rng(42)
     S0 = 1345.0  # starting rate (NGN/USD)
     mu = 0.0001  # small daily drift
     sigma = 0.01  # 1% daily vol
     dt = 1 / 252
     days = 90
 
-    rate = S0
-    for _ in range(days):
-        z = np.random.normal()
-        rate *= np.exp(mu * dt + sigma * np.sqrt(dt) * z)
+    z = rng.standard_normal(days)
+    rate = S0 * np.exp((mu * dt + sigma * np.sqrt(dt) * z).sum())
 
     # After 90 days, rate should still be in a reasonable range (±30%)
     assert 900 < rate < 1800, f"GBM path ended at unreasonable rate: {rate}"
+
+
+def test_regime_weighted_paths_shape_and_seed():
+    """Regime-weighted paths should be (simulations, days), positive and reproducible."""
+    from analytics.advanced_analytics import simulate_regime_weighted_paths
+
+    stats = {"p_high": 0.3, "mu_low": 0.0, "sigma_low": 0.05, "mu_high": 0.0, "sigma_high": 0.2}
+    paths = simulate_regime_weighted_paths(1500.0, days=30, simulations=200, regime_stats=stats, seed=7)
+    assert paths.shape == (200, 30)
+    assert (paths > 0).all()
+    np.testing.assert_array_equal(
+        paths,
+        simulate_regime_weighted_paths(1500.0, days=30, simulations=200, regime_stats=stats, seed=7),
+    )
+
+
+def test_terminal_rates_match_full_path_distribution():
+    """Streaming terminal rates should match the last column of full paths statistically."""
+    from analytics.advanced_analytics import simulate_regime_weighted_paths, simulate_terminal_rates
+
+    stats = {"p_high": 0.4, "mu_low": 0.0, "sigma_low": 0.05, "mu_high": 0.0, "sigma_high": 0.25}
+    full = simulate_regime_weighted_paths(1500.0, days=60, simulations=20000, regime_stats=stats, seed=1)[:, -1]
+    terminal = simulate_terminal_rates(1500.0, days=60, simulations=20000, regime_stats=stats, seed=2)
+    assert terminal.shape == (20000,)
+    np.testing.assert_allclose(
+        np.percentile(terminal, [5, 50, 95]), np.percentile(full, [5, 50, 95]), rtol=0.01
+    )
+
+
+def test_analytics_pipeline_runs_both_stages(monkeypatch):
+    """run_analytics_pipeline should run the FX simulation and supplier risk stages."""
+    import analytics.advanced_analytics as aa
+
+    calls = []
+    monkeypatch.setattr(aa, "run_fx_simulation", lambda **kw: calls.append(("fx", kw)) or "fx")
+    monkeypatch.setattr(aa, "run_supplier_risk", lambda: calls.append(("risk", {})))
+
+    assert aa.run_analytics_pipeline(currency_id=2, days=30, simulations=100) == ("fx", None)
+    assert sorted(name for name, _ in calls) == ["fx", "risk"]
+    assert dict(calls)["fx"] == {"currency_id": 2, "days": 30, "simulations": 100}
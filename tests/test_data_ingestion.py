@@ -31,7 +31,25 @@ def test_populate_warehouse_functions_exist():
         "populate_fact_procurement",
         "populate_supplier_spend_summary",
         "populate_supplier_performance_metrics",
+        "populate_supplier_risk_summary",
         "populate_financial_kpis",
     ]
     for fn_name in expected:
         assert hasattr(pw, fn_name), f"Missing function: {fn_name}"
+
+
+def test_loader_accepts_parsed_dataframes_like_csv_files():
+    """load_dataframes should validate uploads exactly as load_all_files reads them from disk."""
+    from pathlib import Path
+    from data_ingestion.external_data_loader import ExternalDataLoader
+
+    sample_dir = Path(__file__).resolve().parent.parent / "external_data_samples"
+    from_files = ExternalDataLoader(sample_dir)
+    assert from_files.load_all_files()
+
+    dfs = {name: pd.read_csv(sample_dir / f"{name}.csv") for name in ExternalDataLoader.required_files}
+    from_frames = ExternalDataLoader()
+    assert from_frames.load_dataframes(dfs)
+    for name, df in from_files.data.items():
+        pd.testing.assert_frame_equal(from_frames.data[name], df)
+        assert from_frames.data[name] is not dfs[name]
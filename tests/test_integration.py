@@ -3,36 +3,25 @@
 import os
 import pytest
 
-# ── Helper: detect whether MySQL is reachable ────────────────────────────────
 
-def _mysql_available() -> bool:
-    """Return True only if MySQL is actually accepting connections."""
-    try:
-        from sqlalchemy import create_engine, text
-        from config import DATABASE_URL
-        engine = create_engine(DATABASE_URL, connect_args={"connect_timeout": 3})
-        with engine.connect() as conn:
-            conn.execute(text("SELECT 1"))
-        return True
-    except Exception:
-        return False
-
-
-_skip_no_db = pytest.mark.skipif(
-    not _mysql_available(),
-    reason="MySQL is not reachable (CI or no local server)",
-)
+@pytest.fixture(scope="session")
+def compiled_app():
+    """Byte-compile streamlit_app.py once per session; returns the .pyc path."""
+    import py_compile
+    from pathlib import Path
+    app_path = Path(__file__).resolve().parent.parent / "streamlit_app.py"
+    return py_compile.compile(str(app_path), doraise=True)
 
 
-def test_streamlit_app_compiles():
+def test_streamlit_app_compiles(compiled_app):
     """streamlit_app.py should compile without syntax errors."""
-    import py_compile
-    py_compile.compile("streamlit_app.py", doraise=True)
+    assert compiled_app
 
 
-@_skip_no_db
-def test_database_connectivity():
+@pytest.mark.requires_db
+def test_database_connectivity(mysql_available):
     """Database should be reachable and return data."""
+    assert mysql_available
     from sqlalchemy import create_engine, text
     from config import DATABASE_URL
 
@@ -42,9 +31,10 @@ def test_database_connectivity():
         assert result == 1
 
 
-@_skip_no_db
-def test_core_tables_populated():
+@pytest.mark.requires_db
+def test_core_tables_populated(mysql_available):
     """All core transactional and warehouse tables should have data."""
+    assert mysql_available
     from sqlalchemy import create_engine, text
     from config import DATABASE_URL
 